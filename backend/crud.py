@@ -1,3 +1,4 @@
+from sqlalchemy import delete, insert, select, tuple_, update
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import models
@@ -5,6 +6,8 @@ from pydantic import BaseModel
 
 from sqlalchemy.exc import SQLAlchemyError
 import logging
+import os
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,6 +15,18 @@ logger = logging.getLogger(__name__)
 # CRUD = Create, Read, Update, Delete
 # These functions handle all database operations
 
+# Stats cache - reused until it expires or a write bumps the version
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "10"))
+_cache_version = 0
+_stats_cache = {"token": -1, "value": None, "expires": 0.0}
+
+
+def invalidate_stats_cache() -> None:
+    """Mark cached stats as stale after videos are added, changed or removed"""
+    global _cache_version
+    _cache_version += 1
+
+
 def get_video(db: Session, video_id: int) -> Optional[models.Video]:
     """
     Get single video by ID
@@ -26,20 +41,44 @@ def get_video(db: Session, video_id: int) -> Optional[models.Video]:
     return db.query(models.Video).filter(models.Video.id == video_id).first()
 
 
+def get_video_storage_fields(db: Session, video_id: int):
+    """
+    Get only the storage-related columns of a video
+    
+    Args:
+        db: Database session
+        video_id: ID of video to get
+        
+    Returns:
+        Row with storage_path, original_filename, mime_type and title,
+        or None if not found
+    """
+    return db.execute(
+        select(
+            models.Video.storage_path,
+            models.Video.original_filename,
+            models.Video.mime_type,
+            models.Video.title
+        ).where(models.Video.id == video_id)
+    ).first()
+
+
 def get_videos(
     db: Session, 
     skip: int = 0, 
     limit: int = 100,
-    status: Optional[str] = None
+    status: Optional[models.VideoStatus] = None,
+    after_id: Optional[int] = None
 ) -> List[models.Video]:
     """
     Get list of videos with optional filtering
     
     Args:
         db: Database session
-        skip: Number of records to skip (for pagination)
+        skip: Number of records to skip (deprecated, use after_id)
         limit: Maximum number of records to return
         status: Optional status filter
+        after_id: Return videos with id greater than this (keyset pagination)
         
     Returns:
         List of Video objects
@@ -50,8 +89,15 @@ def get_videos(
     if status:
         query = query.filter(models.Video.status == status)
     
-    # Apply pagination and return
-    return query.offset(skip).limit(limit).all()
+    # Keyset pagination seeks straight to the cursor instead of
+    # scanning and discarding skipped rows
+    if after_id is not None:
+        query = query.filter(models.Video.id > after_id)
+    elif skip:
+        query = query.offset(skip)
+    
+    # Stable order, uses the status/id index
+    return query.order_by(models.Video.id).limit(limit).all()
 
 
 def create_video(db: Session, title: str, duration: int, file_size_mb: Optional[int] = None) -> models.Video:
@@ -66,17 +112,20 @@ def create_video(db: Session, title: str, duration: int, file_size_mb: Optional[
         if len(title.strip()) == 0:
             raise ValueError("Title cannot be empty")
         
-        # Create video
-        db_video = models.Video(
-            title=title.strip(),  # Remove whitespace
-            duration=duration,
-            file_size_mb=file_size_mb,
-            status="processing"
-        )
-        
-        db.add(db_video)
+        # Create video - INSERT ... RETURNING loads server defaults
+        # (id, created_at) without a refresh SELECT
+        db_video = db.execute(
+            insert(models.Video)
+            .values(
+                title=title.strip(),  # Remove whitespace
+                duration=duration,
+                file_size_mb=file_size_mb,
+                status=models.VideoStatus.PROCESSING
+            )
+            .returning(models.Video)
+        ).scalar_one()
         db.commit()
-        db.refresh(db_video)
+        invalidate_stats_cache()
         
         logger.info(f"Created video: {db_video.id} - {db_video.title}")
         return db_video
@@ -90,7 +139,48 @@ def create_video(db: Session, title: str, duration: int, file_size_mb: Optional[
         raise
 
 
-def update_video_status(db: Session, video_id: int, status: str) -> Optional[models.Video]:
+def create_uploaded_video(
+    db: Session,
+    title: str,
+    file_size_mb: int,
+    storage_path: str,
+    storage_url: str,
+    original_filename: str,
+    mime_type: str
+) -> int:
+    """
+    Create video record for a file already uploaded to storage
+    
+    Returns:
+        ID of the created video (status READY)
+    """
+    try:
+        # INSERT ... RETURNING id - caller already has every other value
+        video_id = db.execute(
+            insert(models.Video)
+            .values(
+                title=title,
+                duration=None,  # Could extract with ffmpeg later
+                file_size_mb=file_size_mb,
+                status=models.VideoStatus.READY,
+                storage_path=storage_path,
+                storage_url=storage_url,
+                original_filename=original_filename,
+                mime_type=mime_type
+            )
+            .returning(models.Video.id)
+        ).scalar_one()
+        db.commit()
+        invalidate_stats_cache()
+        return video_id
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Database error creating uploaded video: {e}")
+        db.rollback()
+        raise
+
+
+def update_video_status(db: Session, video_id: int, status: models.VideoStatus) -> Optional[models.Video]:
     """
     Update video status
     
@@ -102,12 +192,17 @@ def update_video_status(db: Session, video_id: int, status: str) -> Optional[mod
     Returns:
         Updated Video object or None if not found
     """
-    db_video = get_video(db, video_id)
+    # Single UPDATE ... RETURNING instead of SELECT + UPDATE + refresh
+    db_video = db.execute(
+        update(models.Video)
+        .where(models.Video.id == video_id)
+        .values(status=status)
+        .returning(models.Video)
+    ).scalars().first()
+    db.commit()
     
     if db_video:
-        db_video.status = status
-        db.commit()
-        db.refresh(db_video)
+        invalidate_stats_cache()
     
     return db_video
 
@@ -123,11 +218,14 @@ def delete_video(db: Session, video_id: int) -> bool:
     Returns:
         True if deleted, False if not found
     """
-    db_video = get_video(db, video_id)
+    # Single DELETE instead of SELECT + DELETE
+    result = db.execute(
+        delete(models.Video).where(models.Video.id == video_id)
+    )
+    db.commit()
     
-    if db_video:
-        db.delete(db_video)
-        db.commit()
+    if result.rowcount > 0:
+        invalidate_stats_cache()
         return True
     
     return False
@@ -148,4 +246,57 @@ def get_video_count_by_status(db: Session) -> dict:
         .all()
     )
     
-    return {status: count for status, count in results}
\ No newline at end of file
+    return {status.value: count for status, count in results}
+
+
+def get_stats(db: Session) -> dict:
+    """
+    Get platform totals computed in the database
+    Results are cached for STATS_CACHE_TTL seconds
+    
+    Returns:
+        Dictionary with total_videos, total_duration, total_size_mb
+        and status_breakdown
+    """
+    from sqlalchemy import func
+    
+    token = _cache_version
+    if _stats_cache["token"] == token and time.monotonic() < _stats_cache["expires"]:
+        return _stats_cache["value"]
+    
+    # One query: GROUPING SETS ((status), ()) returns a row per status
+    # plus a grand-total row (GROUPING(status) = 1)
+    rows = db.execute(
+        select(
+            models.Video.status,
+            func.grouping(models.Video.status),
+            func.count(models.Video.id),
+            func.coalesce(func.sum(models.Video.duration), 0),
+            func.coalesce(func.sum(models.Video.file_size_mb), 0)
+        ).group_by(
+            func.grouping_sets(tuple_(models.Video.status), tuple_())
+        )
+    ).all()
+    
+    stats = {
+        "total_videos": 0,
+        "total_duration": 0,
+        "total_size_mb": 0,
+        "status_breakdown": {}
+    }
+    for status, is_total, count, duration, size_mb in rows:
+        if is_total:
+            stats.update(
+                total_videos=count,
+                total_duration=duration,
+                total_size_mb=size_mb
+            )
+        else:
+            stats["status_breakdown"][status.value] = count
+    
+    _stats_cache.update(
+        token=token,
+        value=stats,
+        expires=time.monotonic() + STATS_CACHE_TTL
+    )
+    return stats
\ No newline at end of file
@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import os
 from dotenv import load_dotenv
 
@@ -11,20 +12,40 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 
+# Connection pool settings
+# Direct Postgres: keep DB_POOL_PRE_PING=true
+# PgBouncer (transaction pooling): set DB_POOL_CLASS=null, or set
+# DB_POOL_PRE_PING=false and DB_POOL_RECYCLE below server_idle_timeout
+DB_POOL_CLASS = os.getenv("DB_POOL_CLASS", "queue").lower()
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # -1 = never recycle
+
 # Create database engine
 # Engine = manages connections to database
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_size=5,         # Keep 5 connections ready
-    max_overflow=10      # Allow 10 extra connections if needed
-)
+if DB_POOL_CLASS == "null":
+    # No app-side pooling - PgBouncer does it
+    engine = create_engine(
+        DATABASE_URL,
+        poolclass=NullPool,
+        pool_pre_ping=DB_POOL_PRE_PING
+    )
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        pool_pre_ping=DB_POOL_PRE_PING,  # Verify connections before using
+        pool_size=DB_POOL_SIZE,          # Connections kept ready
+        max_overflow=DB_MAX_OVERFLOW,    # Extra connections if needed
+        pool_recycle=DB_POOL_RECYCLE     # Replace connections older than this (seconds)
+    )
 
 # Create session factory
 # Session = your "conversation" with database
 SessionLocal = sessionmaker(
     autocommit=False,    # Don't auto-save changes
     autoflush=False,     # Don't auto-send to database
+    expire_on_commit=False,  # Keep loaded values after commit (no re-SELECT)
     bind=engine          # Connect to our engine
 )
 
@@ -1,6 +1,8 @@
+import asyncio
+import contextlib
 import os
-import uuid
-from datetime import datetime
+import secrets
+import time
 from typing import Optional
 import aiofiles
 
@@ -8,6 +10,15 @@ import aiofiles
 MAX_FILE_SIZE_MB = 50
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
+# Chunk size used when streaming uploads to storage (fewer, larger writes)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# (suffix, divisor) per power of 1024, indexed by bit_length
+_SIZE_UNITS = (("B", 1), ("KB", 1024), ("MB", 1024 ** 2), ("GB", 1024 ** 3), ("TB", 1024 ** 4))
+
+# Path separators and dangerous characters -> "_" (".." handled separately)
+_SANITIZE_TABLE = str.maketrans({char: '_' for char in '/\\<>:"|?*'})
+
 
 def generate_unique_filename(original_filename: str) -> str:
     """
@@ -17,16 +28,13 @@ def generate_unique_filename(original_filename: str) -> str:
         original_filename: User's original filename
         
     Returns:
-        Unique filename with timestamp and UUID
+        Unique filename with hex nanosecond timestamp and random suffix
     """
     # Get file extension
     _, ext = os.path.splitext(original_filename)
     
-    # Generate unique name: timestamp_uuid.ext
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]  # First 8 chars of UUID
-    
-    return f"{timestamp}_{unique_id}{ext}"
+    # Generate unique name: timestamp_random.ext (sorts by upload time)
+    return f"{time.time_ns():x}_{secrets.token_hex(4)}{ext}"
 
 
 def sanitize_filename(filename: str) -> str:
@@ -39,14 +47,8 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename
     """
-    # Remove path separators and dangerous characters
-    dangerous_chars = ['/', '\\', '..', '<', '>', ':', '"', '|', '?', '*']
-    
-    sanitized = filename
-    for char in dangerous_chars:
-        sanitized = sanitized.replace(char, '_')
-    
-    return sanitized
+    # Remove path separators and dangerous characters in one pass
+    return filename.translate(_SANITIZE_TABLE).replace('..', '_')
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -59,11 +61,9 @@ def format_file_size(size_bytes: int) -> str:
     Returns:
         Formatted string (e.g., "15.5 MB")
     """
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} TB"
+    index = min((max(int(size_bytes), 1).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    unit, divisor = _SIZE_UNITS[index]
+    return f"{size_bytes / divisor:.1f} {unit}"
 
 
 async def save_upload_file_tmp(upload_file) -> str:
@@ -92,6 +92,54 @@ async def save_upload_file_tmp(upload_file) -> str:
     return tmp_path
 
 
+def get_upload_size(upload_file) -> int:
+    """
+    Get size of an uploaded file without reading it into memory
+    
+    Args:
+        upload_file: FastAPI UploadFile object
+        
+    Returns:
+        Size in bytes
+    """
+    spool = upload_file.file
+    position = spool.tell()
+    spool.seek(0, os.SEEK_END)
+    size = spool.tell()
+    spool.seek(position)
+    return size
+
+
+async def iter_upload_file(upload_file, head: bytes = b"", chunk_size: int = UPLOAD_CHUNK_SIZE):
+    """
+    Stream uploaded file contents in chunks from the current position
+    The next chunk is read while the caller sends the current one
+    
+    Args:
+        upload_file: FastAPI UploadFile object
+        head: Bytes already read from the file (sent first, not re-read)
+        chunk_size: Bytes per chunk
+        
+    Yields:
+        Chunks of file data
+    
+    Use with contextlib.aclosing() - httpx doesn't close the iterators it
+    consumes, and the pending read must not outlive the upload.
+    """
+    next_read = asyncio.ensure_future(upload_file.read(chunk_size))
+    try:
+        if head:
+            yield head
+        while chunk := await next_read:
+            next_read = asyncio.ensure_future(upload_file.read(chunk_size))
+            yield chunk
+    finally:
+        # Wait for the in-flight read so it never runs against a closed file
+        next_read.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await next_read
+
+
 def validate_file_size(file_size: int) -> tuple[bool, Optional[str]]:
     """
     Validate file size is within limits
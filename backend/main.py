@@ -1,14 +1,20 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from contextlib import aclosing, asynccontextmanager
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
+import asyncio
+import httpx
 import os
 import sys
+import time
 import logging
 
-from database import get_db, engine
+from database import get_db, engine, SessionLocal
 import models
 import crud
 
@@ -18,7 +24,13 @@ logger = logging.getLogger(__name__)
 
 # Try to import storage and file utils (may fail if not configured)
 try:
-    from storage import upload_to_storage, is_video_file, get_file_type, get_signed_url
+    from storage import (
+        create_storage_client,
+        upload_to_storage,
+        is_video_file,
+        get_file_type,
+        get_signed_url
+    )
     STORAGE_AVAILABLE = True
     logger.info("Storage module loaded successfully")
 except Exception as e:
@@ -31,20 +43,41 @@ try:
         sanitize_filename,
         validate_file_size,
         format_file_size,
-        save_upload_file_tmp
+        save_upload_file_tmp,
+        get_upload_size,
+        iter_upload_file,
+        MAX_FILE_SIZE_BYTES,
+        MAX_FILE_SIZE_MB
     )
+    from validators import validate_upload_request  # Imports file_utils
     FILE_UTILS_AVAILABLE = True
     logger.info("File utils loaded successfully")
 except Exception as e:
     logger.error(f"File utils failed to load: {e}")
     FILE_UTILS_AVAILABLE = False
 
-# Create database tables
-try:
-    models.Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created/verified")
-except Exception as e:
-    logger.error(f"Failed to create database tables: {e}")
+# Create database tables - only when RUN_MIGRATIONS=1 (e.g. a one-off
+# deploy step), so every worker doesn't re-inspect the schema at boot
+if os.getenv("RUN_MIGRATIONS") == "1":
+    try:
+        models.Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created/verified")
+    except Exception as e:
+        logger.error(f"Failed to create database tables: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared clients at startup and close them on shutdown"""
+    app.state.http = create_storage_client() if STORAGE_AVAILABLE else None
+    yield
+    if app.state.http:
+        await app.state.http.aclose()
+
+
+def get_storage_client(request: Request) -> Optional[httpx.AsyncClient]:
+    """Dependency - the process-wide storage HTTP client"""
+    return request.app.state.http
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -68,9 +101,28 @@ AI-powered video transcription platform with cloud storage.
     contact={
         "name": "Your Name",
         "email": "your.email@example.com"
-    }
+    },
+    default_response_class=ORJSONResponse,  # Faster JSON encoding (native datetime)
+    lifespan=lifespan
 )
 
+# Allowance for multipart framing around the file in upload requests
+UPLOAD_FORM_OVERHEAD_BYTES = 1024 * 1024
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized uploads from Content-Length before the body is read"""
+    if FILE_UTILS_AVAILABLE and request.url.path == "/api/videos/upload":
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > MAX_FILE_SIZE_BYTES + UPLOAD_FORM_OVERHEAD_BYTES:
+            return ORJSONResponse(
+                status_code=413,
+                content={"detail": f"File too large. Maximum size is {MAX_FILE_SIZE_MB}MB"}
+            )
+    return await call_next(request)
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -78,10 +130,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Pagination cursor for browser clients
 )
 
+# Log requests with too many SQL queries (development only)
+if os.getenv("ENV") == "dev":
+    from query_counter import install_query_counter
+    install_query_counter(app, engine)
+
 # Pydantic schemas
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 class VideoBase(BaseModel):
     title: str
@@ -93,7 +151,7 @@ class VideoCreate(VideoBase):
 
 class VideoResponse(VideoBase):
     id: int
-    status: str
+    status: models.VideoStatus
     storage_url: Optional[str] = None
     original_filename: Optional[str] = None
     mime_type: Optional[str] = None
@@ -104,6 +162,10 @@ class VideoResponse(VideoBase):
         from_attributes = True
 
 
+# Validates/serializes a whole list in one pydantic-core call
+_VIDEO_LIST_ADAPTER = TypeAdapter(List[VideoResponse])
+
+
 # ============================================
 # API ENDPOINTS
 # ============================================
@@ -127,14 +189,28 @@ def root():
     }
 
 
+# Database ping is re-run at most once per HEALTH_PING_INTERVAL seconds
+HEALTH_PING_INTERVAL = float(os.getenv("HEALTH_PING_INTERVAL", "1.0"))
+_PING = text("SELECT 1")
+_last_db_ok_at = float("-inf")  # Last successful ping (monotonic seconds)
+
+
 @app.get("/health")
-def health_check(db: Session = Depends(get_db)):
+def health_check():
     """Health check endpoint"""
-    try:
-        db.execute("SELECT 1")
+    global _last_db_ok_at
+    
+    # Only probe the database once per HEALTH_PING_INTERVAL
+    if time.monotonic() - _last_db_ok_at < HEALTH_PING_INTERVAL:
         db_status = "connected"
-    except Exception as e:
-        db_status = f"error: {str(e)}"
+    else:
+        try:
+            with engine.connect() as conn:
+                conn.execute(_PING)
+            _last_db_ok_at = time.monotonic()
+            db_status = "connected"
+        except Exception as e:
+            db_status = f"error: {str(e)}"
     
     storage_status = "configured" if os.getenv("SUPABASE_URL") else "not configured"
     
@@ -142,6 +218,7 @@ def health_check(db: Session = Depends(get_db)):
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "database": db_status,
+        "database_pool": engine.pool.status(),  # No connection checkout
         "storage": storage_status,
         "storage_available": STORAGE_AVAILABLE,
         "file_utils_available": FILE_UTILS_AVAILABLE
@@ -152,18 +229,35 @@ def health_check(db: Session = Depends(get_db)):
 def list_videos(
     skip: int = 0,
     limit: int = 100,
-    status: Optional[str] = None,
+    status: Optional[models.VideoStatus] = None,
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """
     Get list of videos
     
-    - **skip**: Number of records to skip (pagination)
+    - **skip**: Number of records to skip (deprecated, use after_id)
     - **limit**: Maximum records to return
     - **status**: Filter by status (optional)
+    - **after_id**: Cursor - return videos after this ID
+    
+    When more results may follow, the `X-Next-Cursor` response header
+    holds the `after_id` for the next page.
     """
-    videos = crud.get_videos(db, skip=skip, limit=limit, status=status)
-    return videos
+    videos = crud.get_videos(
+        db, skip=skip, limit=limit, status=status, after_id=after_id
+    )
+    headers = {}
+    if videos and len(videos) == limit:
+        headers["X-Next-Cursor"] = str(videos[-1].id)
+    
+    # Build the JSON body directly, skipping per-item response_model validation
+    items = _VIDEO_LIST_ADAPTER.validate_python(videos, from_attributes=True)
+    return Response(
+        content=_VIDEO_LIST_ADAPTER.dump_json(items),
+        media_type="application/json",
+        headers=headers
+    )
 
 
 @app.get("/api/videos/{video_id}", response_model=VideoResponse)
@@ -190,11 +284,27 @@ def create_video(video: VideoCreate, db: Session = Depends(get_db)):
     return db_video
 
 
+# Upload back-pressure: in-flight uploads per worker, and how long a
+# request may wait for a slot before getting 429
+MAX_CONCURRENT_UPLOADS = int(os.getenv("MAX_CONCURRENT_UPLOADS", "4"))
+UPLOAD_QUEUE_TIMEOUT = float(os.getenv("UPLOAD_QUEUE_TIMEOUT", "30"))
+_UPLOAD_SEM = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+
+
+def _persist_uploaded_video(**fields) -> int:
+    """
+    Create the uploaded video's record in its own short-lived session
+    so no pooled connection is held during the storage upload
+    """
+    with SessionLocal() as db:
+        return crud.create_uploaded_video(db, **fields)
+
+
 @app.post("/api/videos/upload", status_code=201)
 async def upload_video(
     file: UploadFile = File(...),
     title: Optional[str] = Form(None),
-    db: Session = Depends(get_db)
+    http: Optional[httpx.AsyncClient] = Depends(get_storage_client)
 ):
     """
     Upload video file to storage and create database record
@@ -209,6 +319,16 @@ async def upload_video(
             detail="File upload service not available. Storage not configured."
         )
     
+    # Wait for an upload slot
+    try:
+        await asyncio.wait_for(_UPLOAD_SEM.acquire(), timeout=UPLOAD_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many uploads in progress. Please retry later.",
+            headers={"Retry-After": str(int(UPLOAD_QUEUE_TIMEOUT))}
+        )
+    
     try:
         # Validate file is present
         if not file:
@@ -220,18 +340,21 @@ async def upload_video(
         # Use provided title or default to filename
         video_title = title if title else os.path.splitext(original_filename)[0]
         
-        # Read file data
-        file_data = await file.read()
-        file_size_bytes = len(file_data)
+        # File size from the spooled upload (file is not read into memory)
+        file_size_bytes = get_upload_size(file)
         file_size_mb = file_size_bytes / (1024 * 1024)
         
+        # Validate extension, title and size before touching file contents
+        validate_upload_request(original_filename, video_title, file_size_bytes)
+        
         # Validate file size
         is_valid, error_msg = validate_file_size(file_size_bytes)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        # Detect file type
-        mime_type = get_file_type(file_data[:2048])
+        # Detect file type from the file header (only 2KB is read here)
+        head = await file.read(2048)
+        mime_type = get_file_type(head)
         
         # Validate it's a video file
         if not is_video_file(mime_type):
@@ -243,12 +366,17 @@ async def upload_video(
         # Generate unique filename
         unique_filename = generate_unique_filename(original_filename)
         
-        # Upload to Supabase Storage
-        upload_result = await upload_to_storage(
-            file_data=file_data,
-            filename=unique_filename,
-            folder="uploads"
-        )
+        # Stream file to Supabase Storage (aclosing stops the read-ahead
+        # even if the upload fails partway)
+        async with aclosing(iter_upload_file(file, head=head)) as file_stream:
+            upload_result = await upload_to_storage(
+                http,
+                file_stream=file_stream,
+                filename=unique_filename,
+                mime_type=mime_type,
+                folder="uploads",
+                file_size=file_size_bytes
+            )
         
         if not upload_result["success"]:
             raise HTTPException(
@@ -256,35 +384,30 @@ async def upload_video(
                 detail=f"Failed to upload file: {upload_result.get('error')}"
             )
         
-        # Create database record
-        db_video = models.Video(
+        # Create database record (sync DB call off the event loop)
+        video_id = await run_in_threadpool(
+            _persist_uploaded_video,
             title=video_title,
-            duration=None,  # Could extract with ffmpeg later
             file_size_mb=int(file_size_mb),
-            status="ready",
             storage_path=upload_result["storage_path"],
             storage_url=upload_result["file_url"],
             original_filename=original_filename,
             mime_type=mime_type
         )
         
-        db.add(db_video)
-        db.commit()
-        db.refresh(db_video)
-        
-        logger.info(f"Video uploaded successfully: {db_video.id}")
+        logger.info(f"Video uploaded successfully: {video_id}")
         
         return {
             "message": "File uploaded successfully",
             "video": {
-                "id": db_video.id,
-                "title": db_video.title,
+                "id": video_id,
+                "title": video_title,
                 "filename": original_filename,
                 "size": format_file_size(file_size_bytes),
                 "size_mb": int(file_size_mb),
                 "mime_type": mime_type,
-                "status": db_video.status,
-                "storage_url": db_video.storage_url
+                "status": models.VideoStatus.READY,
+                "storage_url": upload_result["file_url"]
             }
         }
         
@@ -292,18 +415,15 @@ async def upload_video(
         raise
     except Exception as e:
         logger.error(f"Upload failed: {str(e)}")
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    finally:
+        _UPLOAD_SEM.release()
 
 
 @app.delete("/api/videos/{video_id}")
 def delete_video(video_id: int, db: Session = Depends(get_db)):
     """Delete video from database"""
-    video = crud.get_video(db, video_id)
-    if not video:
-        raise HTTPException(status_code=404, detail="Video not found")
-    
-    # Delete from database
+    # Delete from database (single DELETE, no existence pre-check)
     success = crud.delete_video(db, video_id)
     if not success:
         raise HTTPException(status_code=404, detail="Video not found")
@@ -312,62 +432,72 @@ def delete_video(video_id: int, db: Session = Depends(get_db)):
 
 
 @app.get("/api/videos/{video_id}/download")
-def download_video(video_id: int, db: Session = Depends(get_db)):
+async def download_video(
+    video_id: int,
+    db: Session = Depends(get_db),
+    http: Optional[httpx.AsyncClient] = Depends(get_storage_client)
+):
     """
     Get download URL for video
-    Returns a signed URL valid for 1 hour
+    Returns a signed URL valid for up to 1 hour (see expires_in)
     """
     if not STORAGE_AVAILABLE:
         raise HTTPException(status_code=503, detail="Storage service not available")
     
-    video = crud.get_video(db, video_id)
+    video = await run_in_threadpool(crud.get_video_storage_fields, db, video_id)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
     if not video.storage_path:
         raise HTTPException(status_code=404, detail="Video file not found")
     
-    # Generate signed URL (valid for 1 hour)
-    signed_url = get_signed_url(video.storage_path, expires_in=3600)
+    # Generate signed URL (valid for 1 hour, less if reused from cache)
+    signed = await get_signed_url(http, video.storage_path, expires_in=3600)
     
-    if not signed_url:
+    if not signed:
         raise HTTPException(status_code=500, detail="Failed to generate download URL")
     
+    signed_url, expires_in = signed
     return {
         "download_url": signed_url,
         "filename": video.original_filename,
-        "expires_in": 3600,
-        "note": "URL expires in 1 hour"
+        "expires_in": expires_in,
+        "note": f"URL expires in {expires_in // 60} minutes"
     }
 
 
 @app.get("/api/videos/{video_id}/stream")
-def stream_video(video_id: int, db: Session = Depends(get_db)):
+async def stream_video(
+    video_id: int,
+    db: Session = Depends(get_db),
+    http: Optional[httpx.AsyncClient] = Depends(get_storage_client)
+):
     """
     Get streaming URL for video
-    Returns a signed URL valid for 4 hours
+    Returns a signed URL valid for up to 4 hours (see expires_in)
     """
     if not STORAGE_AVAILABLE:
         raise HTTPException(status_code=503, detail="Storage service not available")
     
-    video = crud.get_video(db, video_id)
+    video = await run_in_threadpool(crud.get_video_storage_fields, db, video_id)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
     if not video.storage_path:
         raise HTTPException(status_code=404, detail="Video file not found")
     
-    # Generate signed URL (valid for 4 hours for streaming)
-    stream_url = get_signed_url(video.storage_path, expires_in=14400)
+    # Generate signed URL (valid for 4 hours for streaming, less if cached)
+    signed = await get_signed_url(http, video.storage_path, expires_in=14400)
     
-    if not stream_url:
+    if not signed:
         raise HTTPException(status_code=500, detail="Failed to generate stream URL")
     
+    stream_url, expires_in = signed
     return {
         "stream_url": stream_url,
         "mime_type": video.mime_type,
         "title": video.title,
-        "expires_in": 14400
+        "expires_in": expires_in
     }
 
 
@@ -376,16 +506,14 @@ def get_stats(db: Session = Depends(get_db)):
     """
     Platform statistics
     """
-    videos = crud.get_videos(db, limit=10000)
-    total_duration = sum(v.duration or 0 for v in videos)
-    total_size = sum(v.file_size_mb or 0 for v in videos)
-    status_counts = crud.get_video_count_by_status(db)
+    stats = crud.get_stats(db)
+    total_duration = stats["total_duration"]
     
     return {
-        "total_videos": len(videos),
+        "total_videos": stats["total_videos"],
         "total_duration_hours": round(total_duration / 3600, 2) if total_duration else 0,
-        "total_storage_gb": round(total_size / 1024, 2),
-        "status_breakdown": status_counts,
+        "total_storage_gb": round(stats["total_size_mb"] / 1024, 2),
+        "status_breakdown": stats["status_breakdown"],
         "database": "PostgreSQL",
         "storage_configured": STORAGE_AVAILABLE
     }
@@ -0,0 +1,16 @@
+-- Video indexes added after the initial schema
+-- create_all() only creates missing tables, never indexes on existing ones,
+-- so run this once against databases created before these indexes existed.
+--
+-- CONCURRENTLY avoids locking writes on a live table, but it cannot run
+-- inside a transaction - run with autocommit (plain psql does this):
+--   psql "$DATABASE_URL" -f backend/migrations/001_video_indexes.sql
+
+-- Status filter + ORDER BY id keyset pagination on /api/videos
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_videos_status_id
+    ON videos (status, id);
+
+-- Partial index for the "unfinished videos" listing
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_videos_processing_created_at
+    ON videos (created_at)
+    WHERE status = 'processing';
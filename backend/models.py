@@ -1,6 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Index, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func, text
 from database import Base
+import enum
+
+
+class VideoStatus(str, enum.Enum):
+    """Video processing lifecycle"""
+    UPLOADING = "uploading"
+    PROCESSING = "processing"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __str__(self):
+        return self.value
+
 
 class Video(Base):
     """
@@ -8,13 +22,34 @@ class Video(Base):
     Each attribute = column in table
     """
     __tablename__ = "videos"  # Table name in database
+    __table_args__ = (
+        # Serves status filter + ORDER BY id pagination in one index scan
+        Index("ix_videos_status_id", "status", "id"),
+        # Small partial index for the "unfinished videos" listing
+        Index(
+            "ix_videos_processing_created_at",
+            "created_at",
+            postgresql_where=text("status = 'processing'")
+        ),
+    )
 
     # Columns
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
     duration = Column(Integer, nullable=True)  # Changed to nullable - we'll calculate it
     file_size_mb = Column(Integer, nullable=True)
-    status = Column(String(50), nullable=False, default="uploading", index=True)
+    status = Column(
+        SQLEnum(
+            VideoStatus,
+            name="video_status",
+            native_enum=False,  # Stays VARCHAR(50) - no migration needed
+            length=50,
+            values_callable=lambda statuses: [s.value for s in statuses]
+        ),
+        nullable=False,
+        default=VideoStatus.UPLOADING,
+        index=True
+    )
     
     # NEW FIELDS for file storage
     storage_path = Column(Text, nullable=True)  # Path in Supabase Storage
@@ -22,10 +57,6 @@ class Video(Base):
     original_filename = Column(String(255), nullable=True)  # User's original filename
     mime_type = Column(String(100), nullable=True)  # video/mp4, etc.
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
-    
-    
     # Timestamps - automatically managed
     created_at = Column(
         DateTime(timezone=True), 
@@ -38,6 +69,15 @@ class Video(Base):
         onupdate=func.now(),  # Auto-update on changes
         nullable=False
     )
+    
+    # Relationships - lazy="raise" so accidental lazy loads (N+1) fail loudly;
+    # load explicitly with selectinload(Video.transcripts)
+    transcripts = relationship(
+        "Transcript",
+        primaryjoin="Video.id == foreign(Transcript.video_id)",
+        back_populates="video",
+        lazy="raise"
+    )
 
     def __repr__(self):
         """String representation for debugging"""
@@ -62,6 +102,13 @@ class Transcript(Base):
         server_default=func.now(),
         nullable=False
     )
+    
+    video = relationship(
+        "Video",
+        primaryjoin="foreign(Transcript.video_id) == Video.id",
+        back_populates="transcripts",
+        lazy="raise"
+    )
 
     def __repr__(self):
         return f"<Transcript(id={self.id}, video_id={self.video_id}, words={self.word_count})>"
\ No newline at end of file
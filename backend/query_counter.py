@@ -0,0 +1,59 @@
+from contextvars import ContextVar
+from typing import List, Optional
+import logging
+import os
+
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Warn when a single request issues more queries than this
+QUERY_COUNT_THRESHOLD = int(os.getenv("QUERY_COUNT_THRESHOLD", "5"))
+
+# Max characters of each statement included in the warning
+STATEMENT_PREVIEW_LENGTH = 200
+
+# SQL statements issued by the current request (None outside a request)
+_request_queries: ContextVar[Optional[List[str]]] = ContextVar("request_queries", default=None)
+
+
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    """Engine hook - remember every statement sent during a request"""
+    queries = _request_queries.get()
+    if queries is not None:
+        queries.append(statement)
+
+
+def install_query_counter(app: FastAPI, engine: Engine, threshold: int = QUERY_COUNT_THRESHOLD) -> None:
+    """
+    Log requests that issue too many SQL queries (dev only)
+    Catches N+1 patterns and extra round-trips before they ship
+
+    Args:
+        app: FastAPI application
+        engine: SQLAlchemy engine to instrument
+        threshold: Warn when a request issues more queries than this
+    """
+    event.listen(engine, "before_cursor_execute", _record_query)
+
+    @app.middleware("http")
+    async def count_queries(request: Request, call_next):
+        # The list is shared with threadpool workers via context copies
+        queries: List[str] = []
+        token = _request_queries.set(queries)
+        try:
+            return await call_next(request)
+        finally:
+            _request_queries.reset(token)
+            if len(queries) > threshold:
+                statements = "\n".join(
+                    f"  {sql[:STATEMENT_PREVIEW_LENGTH]}" for sql in queries
+                )
+                logger.warning(
+                    f"{request.method} {request.url.path} issued {len(queries)} queries "
+                    f"(threshold {threshold}):\n{statements}"
+                )
+
+    logger.info(f"Query counter enabled (threshold {threshold})")
@@ -1,5 +1,6 @@
+from sqlalchemy import insert
 from database import SessionLocal
-import crud
+import models
 
 def seed_database():
     """Add initial data to database for testing"""
@@ -11,39 +12,37 @@ def seed_database():
             {
                 "title": "Introduction to Machine Learning",
                 "duration": 1800,
-                "file_size_mb": 450
+                "file_size_mb": 450,
+                "status": models.VideoStatus.READY
             },
             {
                 "title": "FastAPI Production Guide",
                 "duration": 2400,
-                "file_size_mb": 600
+                "file_size_mb": 600,
+                "status": models.VideoStatus.PROCESSING
             },
             {
                 "title": "PostgreSQL Best Practices",
                 "duration": 3000,
-                "file_size_mb": 750
+                "file_size_mb": 750,
+                "status": models.VideoStatus.PROCESSING
             },
             {
                 "title": "Docker Deployment Tutorial",
                 "duration": 1500,
-                "file_size_mb": 380
+                "file_size_mb": 380,
+                "status": models.VideoStatus.PROCESSING
             }
         ]
         
         print("Seeding database...")
         
-        for video_data in videos_data:
-            video = crud.create_video(
-                db,
-                title=video_data["title"],
-                duration=video_data["duration"],
-                file_size_mb=video_data["file_size_mb"]
-            )
-            print(f"✓ Created: {video.title}")
+        # Bulk insert in one transaction (single executemany round-trip)
+        db.execute(insert(models.Video), videos_data)
+        db.commit()
         
-        # Update one to "ready" status
-        crud.update_video_status(db, 1, "ready")
-        print("✓ Updated video 1 status to 'ready'")
+        for video_data in videos_data:
+            print(f"✓ Created: {video_data['title']} ({video_data['status']})")
         
         print(f"\n✓ Successfully seeded {len(videos_data)} videos!")
         
@@ -1,82 +1,94 @@
-from supabase import create_client, Client
 import os
 from dotenv import load_dotenv
-from typing import Optional
+from typing import AsyncIterator, Optional
 import logging
+import time
+import httpx
+from cachetools import TTLCache
 
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
-from typing import Optional
-import logging
-import sys
-
-# Load environment variables
+# Load environment variables (works locally, not on Render)
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# FORCE print to stdout (Render will show this)
-print("=" * 50, file=sys.stderr)
-print("STORAGE.PY LOADING", file=sys.stderr)
-print("=" * 50, file=sys.stderr)
-
+# Supabase configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET", "videos")
 
-print(f"SUPABASE_URL: {SUPABASE_URL}", file=sys.stderr)
-print(f"SUPABASE_KEY: {'[SET]' if SUPABASE_KEY else '[NOT SET]'}", file=sys.stderr)
-print(f"SUPABASE_BUCKET: {SUPABASE_BUCKET}", file=sys.stderr)
-print("=" * 50, file=sys.stderr)
+# Startup diagnostics (never logs the key itself)
+if logger.isEnabledFor(logging.DEBUG):
+    logger.debug(f"SUPABASE_URL: {SUPABASE_URL}")
+    logger.debug(f"SUPABASE_KEY: {'[SET]' if SUPABASE_KEY else '[NOT SET]'}")
+    logger.debug(f"SUPABASE_BUCKET: {SUPABASE_BUCKET}")
 
-# Rest of your storage.py code...
+# Supabase Storage REST API
+STORAGE_API_URL = f"{SUPABASE_URL.rstrip('/')}/storage/v1" if SUPABASE_URL else None
 
+# Signed URLs are reused for half their lifetime
+# One cache per expires_in value, keyed by storage path -> (url, created_at)
+SIGNED_URL_CACHE_SIZE = 10000
+_signed_url_caches: dict[int, TTLCache] = {}
 
 
-# DEBUG: Print environment variables (REMOVE IN PRODUCTION)
-print(f"DEBUG - SUPABASE_URL: {SUPABASE_URL}")
-print(f"DEBUG - SUPABASE_KEY: {'SET' if SUPABASE_KEY else 'NOT SET'}")
-print(f"DEBUG - SUPABASE_BUCKET: {SUPABASE_BUCKET}")
+def create_storage_client() -> Optional[httpx.AsyncClient]:
+    """
+    Create the HTTP client shared by all storage calls
+    Create once per process and reuse it - keeps TLS connections alive
+    (HTTP/2 lets concurrent requests share one connection)
+    
+    Returns:
+        AsyncClient, or None if credentials are not available
+    """
+    if not (SUPABASE_URL and SUPABASE_KEY):
+        logger.warning("Supabase credentials not found. File upload will not work.")
+        return None
+    
+    try:
+        client = httpx.AsyncClient(
+            http2=True,
+            timeout=300,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+            headers={
+                "Authorization": f"Bearer {SUPABASE_KEY}",
+                "apikey": SUPABASE_KEY
+            }
+        )
+        logger.info("Supabase storage client initialized successfully")
+        return client
+    except Exception as e:
+        logger.error(f"Failed to initialize Supabase storage client: {e}")
+        return None
 
-# Load environment variables (works locally, not on Render)
-load_dotenv()
 
-logger = logging.getLogger(__name__)
+# File signatures (4- or 10-byte prefixes) -> MIME type
+_MAGIC_NUMBERS = {
+    b'\x00\x00\x00\x18': "video/mp4",
+    b'\x00\x00\x00\x1c': "video/mp4",
+    b'RIFF': "video/x-msvideo",
+    b'\x00\x00\x00\x14ftypqt': "video/quicktime",
+}
 
-# Supabase configuration
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET", "videos")
-
-# Only create client if credentials are available
-supabase: Optional[Client] = None
-
-if SUPABASE_URL and SUPABASE_KEY:
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-        logger.info("Supabase client initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize Supabase client: {e}")
-        supabase = None
-else:
-    logger.warning("Supabase credentials not found. File upload will not work.")
+ALLOWED_VIDEO_TYPES = frozenset([
+    'video/mp4',
+    'video/quicktime',
+    'video/x-msvideo',
+    'video/x-matroska',
+    'video/webm'
+])
 
 
 def get_file_type(file_data: bytes) -> str:
     """Detect file type from binary data"""
     try:
         # Simple detection without python-magic dependency
-        if file_data[:4] == b'\x00\x00\x00\x18' or file_data[:4] == b'\x00\x00\x00\x1c':
-            return "video/mp4"
-        elif file_data[:4] == b'RIFF':
-            return "video/avi"
-        elif file_data[:8] == b'\x00\x00\x00\x14ftypqt':
-            return "video/quicktime"
-        else:
-            return "video/mp4"  # Default to mp4
+        # (defaults to mp4 for unknown signatures)
+        return (
+            _MAGIC_NUMBERS.get(file_data[:4])
+            or _MAGIC_NUMBERS.get(file_data[:10], "video/mp4")
+        )
     except Exception as e:
         logger.error(f"Error detecting file type: {e}")
         return "video/mp4"
@@ -84,25 +96,26 @@ def get_file_type(file_data: bytes) -> str:
 
 def is_video_file(mime_type: str) -> bool:
     """Check if MIME type is a video"""
-    allowed_types = [
-        'video/mp4',
-        'video/quicktime',
-        'video/x-msvideo',
-        'video/x-matroska',
-        'video/webm'
-    ]
-    return mime_type in allowed_types
+    return mime_type in ALLOWED_VIDEO_TYPES
 
 
 async def upload_to_storage(
-    file_data: bytes,
+    client: Optional[httpx.AsyncClient],
+    file_stream: AsyncIterator[bytes],
     filename: str,
-    folder: str = "uploads"
+    mime_type: str,
+    folder: str = "uploads",
+    file_size: Optional[int] = None
 ) -> dict:
-    """Upload file to Supabase Storage"""
+    """
+    Upload file to Supabase Storage
+    
+    Chunks from file_stream are forwarded as they are read, so the
+    whole file is never held in memory.
+    """
     
     # Check if Supabase client is available
-    if not supabase:
+    if not client:
         logger.error("Supabase client not initialized")
         return {
             "success": False,
@@ -111,20 +124,25 @@ async def upload_to_storage(
     
     try:
         storage_path = f"{folder}/{filename}"
-        mime_type = get_file_type(file_data[:2048])
+        
+        headers = {
+            "Content-Type": mime_type,
+            "x-upsert": "true"
+        }
+        if file_size is not None:
+            # Known size - send Content-Length instead of chunked encoding
+            headers["Content-Length"] = str(file_size)
         
         # Upload to Supabase Storage
-        response = supabase.storage.from_(SUPABASE_BUCKET).upload(
-            path=storage_path,
-            file=file_data,
-            file_options={
-                "content-type": mime_type,
-                "upsert": "true"
-            }
+        response = await client.post(
+            f"{STORAGE_API_URL}/object/{SUPABASE_BUCKET}/{storage_path}",
+            content=file_stream,
+            headers=headers
         )
+        response.raise_for_status()
         
-        # Get public URL
-        public_url = supabase.storage.from_(SUPABASE_BUCKET).get_public_url(storage_path)
+        # Public URL (built locally, no request needed)
+        public_url = f"{STORAGE_API_URL}/object/public/{SUPABASE_BUCKET}/{storage_path}"
         
         logger.info(f"File uploaded successfully: {storage_path}")
         
@@ -143,13 +161,23 @@ async def upload_to_storage(
         }
 
 
-async def delete_from_storage(storage_path: str) -> bool:
+async def delete_from_storage(client: Optional[httpx.AsyncClient], storage_path: str) -> bool:
     """Delete file from Supabase Storage"""
-    if not supabase:
+    if not client:
         return False
     
     try:
-        supabase.storage.from_(SUPABASE_BUCKET).remove([storage_path])
+        response = await client.request(
+            "DELETE",
+            f"{STORAGE_API_URL}/object/{SUPABASE_BUCKET}",
+            json={"prefixes": [storage_path]}
+        )
+        response.raise_for_status()
+        
+        # Don't hand out URLs for a file that no longer exists
+        for cache in _signed_url_caches.values():
+            cache.pop(storage_path, None)
+        
         logger.info(f"File deleted: {storage_path}")
         return True
     except Exception as e:
@@ -157,17 +185,45 @@ async def delete_from_storage(storage_path: str) -> bool:
         return False
 
 
-def get_signed_url(storage_path: str, expires_in: int = 3600) -> Optional[str]:
-    """Generate signed URL for private file access"""
-    if not supabase:
+async def get_signed_url(
+    client: Optional[httpx.AsyncClient],
+    storage_path: str,
+    expires_in: int = 3600
+) -> Optional[tuple[str, int]]:
+    """
+    Generate signed URL for private file access
+    
+    Returns:
+        (signed_url, seconds until it expires), or None on failure
+        A cached URL has less than expires_in left
+    """
+    if not client:
         return None
     
-    try:
-        response = supabase.storage.from_(SUPABASE_BUCKET).create_signed_url(
-            path=storage_path,
-            expires_in=expires_in
+    cache = _signed_url_caches.get(expires_in)
+    if cache is None:
+        cache = _signed_url_caches[expires_in] = TTLCache(
+            maxsize=SIGNED_URL_CACHE_SIZE,
+            ttl=expires_in / 2
         )
-        return response.get('signedURL')
-    except Exception as e:
-        logger.error(f"Error creating signed URL: {e}")
-        return None
\ No newline at end of file
+    
+    cached = cache.get(storage_path)
+    if cached:
+        signed_url, created_at = cached
+    else:
+        # Taken before the request, so the remaining lifetime is never overstated
+        created_at = time.monotonic()
+        try:
+            response = await client.post(
+                f"{STORAGE_API_URL}/object/sign/{SUPABASE_BUCKET}/{storage_path}",
+                json={"expiresIn": expires_in}
+            )
+            response.raise_for_status()
+            # API returns a path relative to the storage endpoint
+            signed_url = f"{STORAGE_API_URL}/{response.json()['signedURL'].lstrip('/')}"
+        except Exception as e:
+            logger.error(f"Error creating signed URL: {e}")
+            return None
+        cache[storage_path] = (signed_url, created_at)
+    
+    return signed_url, int(expires_in - (time.monotonic() - created_at))
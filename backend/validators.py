@@ -1,27 +1,35 @@
 from fastapi import HTTPException
 from typing import List
 
+from file_utils import MAX_FILE_SIZE_BYTES
+
 # Allowed video file extensions
-ALLOWED_EXTENSIONS = ['.mp4', '.mov', '.avi', '.mkv', '.webm']
+ALLOWED_EXTENSIONS = frozenset(['.mp4', '.mov', '.avi', '.mkv', '.webm'])
+_ALLOWED_EXTENSION_NAMES = frozenset(ext.lstrip('.') for ext in ALLOWED_EXTENSIONS)
 
 # Allowed MIME types
-ALLOWED_MIME_TYPES = [
+ALLOWED_MIME_TYPES = frozenset([
     'video/mp4',
     'video/quicktime',
     'video/x-msvideo',
     'video/x-matroska',
     'video/webm'
-]
+])
 
 MAX_TITLE_LENGTH = 255
 MIN_TITLE_LENGTH = 3
 
+# Characters not allowed in titles
+INVALID_TITLE_CHARS = frozenset('<>:"/\\|?*')
+
 
 def validate_file_extension(filename: str) -> bool:
     """Check if file has allowed extension"""
-    import os
-    _, ext = os.path.splitext(filename.lower())
-    return ext in ALLOWED_EXTENSIONS
+    # Only the extension is lowercased, not the whole filename
+    # Like splitext, look at the last path component only - a leading-dot
+    # name like ".mp4" or "dir/.mp4" has no extension
+    name, _, ext = filename.rpartition('/')[2].rpartition('.')
+    return bool(name.lstrip('.')) and ext.lower() in _ALLOWED_EXTENSION_NAMES
 
 
 def validate_title(title: str) -> tuple[bool, str]:
@@ -35,11 +43,11 @@ def validate_title(title: str) -> tuple[bool, str]:
     if len(title) > MAX_TITLE_LENGTH:
         return False, f"Title must be at most {MAX_TITLE_LENGTH} characters"
     
-    # Check for invalid characters
-    invalid_chars = ['<', '>', ':', '"', '/', '\\', '|', '?', '*']
-    for char in invalid_chars:
-        if char in title:
-            return False, f"Title contains invalid character: {char}"
+    # Check for invalid characters (one pass over the title)
+    invalid = INVALID_TITLE_CHARS.intersection(title)
+    if invalid:
+        char = min(invalid, key=title.index)  # Report the first one in the title
+        return False, f"Title contains invalid character: {char}"
     
     return True, ""
 
@@ -53,7 +61,7 @@ def validate_upload_request(filename: str, title: str, file_size: int) -> None:
     if not validate_file_extension(filename):
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
+            detail=f"Invalid file type. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
         )
     
     # Validate title
@@ -62,7 +70,6 @@ def validate_upload_request(filename: str, title: str, file_size: int) -> None:
         raise HTTPException(status_code=400, detail=error)
     
     # Size already validated in file_utils, but double-check
-    from file_utils import MAX_FILE_SIZE_BYTES
     if file_size > MAX_FILE_SIZE_BYTES:
         raise HTTPException(
             status_code=400,